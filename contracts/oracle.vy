@@ -1,6 +1,7 @@
 # @version 0.4.3
 
 PRICE_SCALE: constant(uint256) = 10 ** 8
+MAX_BATCH: constant(uint256) = 128
 
 prices: public(HashMap[bytes32, uint256])
 timestamps: public(HashMap[bytes32, uint256])
@@ -18,6 +19,18 @@ def __init__(_updater: address):
     self.updater = _updater
 
 
+@internal
+def _set_price(symbol: bytes32, price: uint256, ts: uint256):
+    # timestamp sanity: allow small future skew, reject very old timestamps
+    assert ts <= block.timestamp + 300, "ts too far future"
+    assert ts >= block.timestamp - 86400, "ts too old"
+
+    self.prices[symbol] = price
+    self.timestamps[symbol] = ts
+
+    log PriceUpdated(symbol=symbol, price=price, ts=ts)
+
+
 @external
 def setPrice(symbol: bytes32, price: uint256, ts: uint256):
     """
@@ -26,15 +39,25 @@ def setPrice(symbol: bytes32, price: uint256, ts: uint256):
     ts: unix timestamp
     """
     assert msg.sender == self.updater, "only updater"
+    self._set_price(symbol, price, ts)
 
-    # timestamp sanity: allow small future skew, reject very old timestamps
-    assert ts <= block.timestamp + 300, "ts too far future"
-    assert ts >= block.timestamp - 86400, "ts too old"
 
-    self.prices[symbol] = price
-    self.timestamps[symbol] = ts
+@external
+def setPrices(
+    _symbols: DynArray[bytes32, MAX_BATCH],
+    _prices: DynArray[uint256, MAX_BATCH],
+    _tss: DynArray[uint256, MAX_BATCH],
+):
+    """
+    Batch version of setPrice: updates up to MAX_BATCH symbols in one tx.
+    All three arrays must have the same length; the update is all-or-nothing.
+    """
+    assert msg.sender == self.updater, "only updater"
+    assert len(_symbols) == len(_prices), "length mismatch"
+    assert len(_symbols) == len(_tss), "length mismatch"
 
-    log PriceUpdated(symbol=symbol, price=price, ts=ts)
+    for i: uint256 in range(len(_symbols), bound=MAX_BATCH):
+        self._set_price(_symbols[i], _prices[i], _tss[i])
 
 
 @view
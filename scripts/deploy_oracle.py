@@ -1,41 +1,45 @@
 # deploy_oracle.py (robusto contra BOM/encodings estranhos)
 from web3 import Web3
-import json, os, sys, traceback
+import json, mmap, os, sys, traceback
+
+try:
+    import orjson  # opcional: parser JSON em C, bem mais rápido que json em ABIs grandes
+except ImportError:
+    orjson = None
 
 RPC = 'http://127.0.0.1:8545'
 ABI_FILE = '_oracle.json'
 BYTECODE_FILE = '_oracle.bc'
 DEPLOYED_FILE = 'deployed_info.json'
+UTF8_BOM = b'\xef\xbb\xbf'
+HEX_DIGITS = b'0123456789abcdefABCDEF'
+TRIM_BYTES = b' \t\r\n\x0b\x0c"'  # whitespace and quotes around the hex
 
 def read_text_file_tolerant(path):
-    # tenta várias decodificações e retorna string (ou levanta erro com diagnóstico)
+    # detecta BOM e decodifica uma única vez (sem tentativa-e-erro entre encodings)
     with open(path, 'rb') as f:
         raw = f.read()
-    # quick diagnostic: show first few bytes (hex)
-    start_bytes = raw[:8]
-    hex_preview = start_bytes.hex()
-    # try utf-8-sig first (handles BOM)
-    decoders = ['utf-8-sig', 'utf-8', 'latin-1']
-    last_exc = None
-    for enc in decoders:
-        try:
-            s = raw.decode(enc)
-            # sanity check: JSON must start with [ or { (allow whitespace before)
-            if s.lstrip().startswith(('[','{')):
-                return s
-            # if decode ok but not JSON-like, still return but warn
-            return s
-        except Exception as e:
-            last_exc = e
-    # if we get here, none worked
-    msg = (
-        f"Failed to decode file {path} with tried encodings {decoders}.\n"
-        f"First bytes (hex): {hex_preview}\n"
-        f"Last exception: {last_exc}\n"
-    )
-    raise ValueError(msg)
+    if raw[:3] == UTF8_BOM:
+        enc = 'utf-8-sig'
+    else:
+        enc = 'utf-8'
+    try:
+        return raw.decode(enc)
+    except UnicodeDecodeError as e:
+        # not valid utf-8: latin-1 maps every byte, replace keeps it from ever raising
+        print(f"[WARN] {path} não é UTF-8 válido ({e}); primeiros bytes (hex): {raw[:8].hex()}; usando latin-1")
+        return raw.decode('latin-1', errors='replace')
 
 def load_json_tolerant(path):
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        if raw[:3] == UTF8_BOM:
+            raw = raw[3:]
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. non-UTF-8 file: fall through to the tolerant path for decoding + diagnostics
     txt = read_text_file_tolerant(path)
     try:
         return json.loads(txt)
@@ -44,6 +48,29 @@ def load_json_tolerant(path):
         snippet = txt[:400].replace('\n','\\n')
         raise ValueError(f"Arquivo {path} decodificado mas JSON inválido. snippet: {snippet}\nError: {e}")
 
+def read_bytecode_hex(path):
+    # bytecode é texto hex (às vezes com BOM/aspas): apara as bordas por índice no mmap e copia só o miolo, uma vez
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return '0x'
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start, end = 0, len(mm)
+            if mm[:3] == UTF8_BOM:
+                start = len(UTF8_BOM)
+            while start < end and mm[start] in TRIM_BYTES:
+                start += 1
+            while end > start and mm[end - 1] in TRIM_BYTES:
+                end -= 1
+            if mm[start:start + 2] in (b'0x', b'0X'):
+                start += 2
+            bc = mm[start:end]
+    # translate deletes every hex digit in one C-level pass; anything left over is garbage
+    bad = bc.translate(None, HEX_DIGITS)
+    if bad:
+        raise ValueError(f"Arquivo {path} não contém bytecode hex válido; bytes inválidos (hex): {bad[:8].hex()}")
+    # web3 treats bytes as raw bytecode, so hand it the hex string
+    return '0x' + bc.decode('ascii')
+
 # start
 if not os.path.exists(ABI_FILE) or not os.path.exists(BYTECODE_FILE):
     print(f"[ERROR] Arquivos {ABI_FILE} e {BYTECODE_FILE} devem existir na pasta atual: {os.getcwd()}")
@@ -59,18 +86,12 @@ except Exception as e:
 
 # read bytecode tolerant (it's typically hex text, possibly with BOM)
 try:
-    bc_txt = read_text_file_tolerant(BYTECODE_FILE).strip()
-    # remove common garbage and quotes
-    if bc_txt.startswith('"') and bc_txt.endswith('"'):
-        bc_txt = bc_txt[1:-1]
+    bc_txt = read_bytecode_hex(BYTECODE_FILE)
 except Exception as e:
     print("[ERROR] Falha ao ler bytecode:", e)
     traceback.print_exc()
     sys.exit(1)
 
-if not bc_txt.startswith('0x'):
-    bc_txt = '0x' + bc_txt
-
 # connect to RPC
 w3 = Web3(Web3.HTTPProvider(RPC))
 if not w3.is_connected():
@@ -89,25 +110,17 @@ print("Conta default (usada para deploy):", acct)
 
 Contract = w3.eth.contract(abi=abi, bytecode=bc_txt)
 
-# find constructor inputs
-constructor_inputs = []
-for item in abi:
-    if item.get('type') == 'constructor':
-        constructor_inputs = item.get('inputs', [])
-        break
+# find constructor inputs (at most one constructor; stop at the first match)
+constructor_inputs = next((item.get('inputs', []) for item in abi if item.get('type') == 'constructor'), [])
+
+# helper default values (simple), precomputed per ABI type name
+TYPE_DEFAULTS = {'address': acct or ('0x' + '0'*40), 'bool': False, 'string': "", 'bytes': b'', 'uint': 0, 'int': 0}
+TYPE_DEFAULTS.update({f'{p}{n}': 0 for p in ('uint', 'int') for n in range(8, 257, 8)})
+TYPE_DEFAULTS.update({f'bytes{n}': b'' for n in range(1, 33)})
 
-# helper default values (simple)
 def default_for_type(typ):
-    if typ.startswith('uint') or typ.startswith('int') or typ in ('uint','int'):
-        return 0
-    if typ == 'address':
-        return acct or ('0x' + '0'*40)
-    if typ == 'bool':
-        return False
-    if typ == 'string':
-        return ""
-    if typ.startswith('bytes'):
-        return b''
+    if typ in TYPE_DEFAULTS:
+        return TYPE_DEFAULTS[typ]
     if typ.endswith(']'):
         return []
     return 0
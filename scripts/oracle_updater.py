@@ -1,15 +1,28 @@
 import os
 import sys
+import math
 import time
+import socket
 import argparse
 import logging
-from typing import List
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from web3 import Web3, exceptions
+from eth_abi import encode as abi_encode
 from eth_account import Account
 import yfinance as yf
 
+try:
+    import numpy as np  # optional: vectorized price scaling for large ticker lists
+except ImportError:
+    np = None
+
 load_dotenv()
 
 # -------- CONFIG / ENV (defaults)
@@ -19,8 +32,52 @@ UPDATER_PRIVATE_KEY = os.getenv("UPDATER_PRIVATE_KEY", "")
 PRICE_SCALE = int(os.getenv("PRICE_SCALE", 10**8))
 GAS_MULTIPLIER = float(os.getenv("GAS_MULTIPLIER", "1.1"))
 CHAIN_ID = int(os.getenv("CHAIN_ID", "31337"))  # Hardhat default
-
-# Minimal ABI for oracle.setPrice(bytes32,uint256,uint256)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "16"))
+YAHOO_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+YAHOO_COOKIE_URL = "https://fc.yahoo.com"
+YAHOO_CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+YAHOO_TIMEOUT = 10
+RPC_POOL_CONNECTIONS = 32
+RPC_POOL_MAXSIZE = 64
+# seconds a fetched price is reused; ~Yahoo's own quote refresh. Only saves requests when
+# watch rounds come faster than this (--interval < PRICE_TTL); one --once round never hits it
+PRICE_TTL = float(os.getenv("PRICE_TTL", "15"))
+MAX_STALE = int(os.getenv("MAX_STALE", "3600"))  # re-publish an unchanged price after this many seconds
+VECTORIZE_MIN_TICKERS = 32  # below this, numpy call overhead outweighs the per-ticker loop
+MAX_WATCH_INTERVAL = int(os.getenv("MAX_WATCH_INTERVAL", "300"))  # upper bound for the adaptive watch sleep
+CADENCE_EMA_ALPHA = 0.3
+# rounds with at least this many txs are signed across processes (pool startup costs ~100ms)
+PARALLEL_SIGN_MIN_TXS = int(os.getenv("PARALLEL_SIGN_MIN_TXS", "64"))
+# publish all tickers with one oracle.setPrices tx (set BATCH_UPDATES=0 for oracles without it)
+BATCH_UPDATES = os.getenv("BATCH_UPDATES", "1") != "0"
+ORACLE_MAX_BATCH = 128  # must match MAX_BATCH in contracts/oracle.vy
+DEFAULT_GAS_LIMIT = 200_000  # used when gas estimation fails
+DEFAULT_GAS_PRICE = 1_000_000_000  # fallback 1 gwei
+
+# next nonce for the updater account; this script is the only sender, so it is
+# loaded once per run_once and incremented locally after each send
+_nonce: Optional[int] = None
+
+# ticker -> (price, fetched_at); fetches within PRICE_TTL are served from here
+_price_cache: Dict[str, Tuple[float, float]] = {}
+# ticker -> (price_scaled, ts) last confirmed on-chain; unchanged prices are not
+# re-sent until MAX_STALE seconds have passed
+_last_pushed: Dict[str, Tuple[int, int]] = {}
+
+# fn_name -> (base_gas, gas_per_entry) estimated once on never-written probe symbols
+# (worst case: cold storage slots); reset after a revert so the next round re-estimates
+_gas_model: Dict[str, Tuple[int, int]] = {}
+_gas_calibrated = False
+# False once calibration shows the oracle has no setPrices (deployed from the old contract)
+_setprices_supported = True
+
+# ticker -> (price_scaled, changed_at) of the last observed price change, and
+# ticker -> EMA of seconds between changes; used to pace watch mode
+_last_change: Dict[str, Tuple[int, float]] = {}
+_change_cadence: Dict[str, float] = {}
+
+# Minimal ABI for oracle.setPrice(bytes32,uint256,uint256) and
+# oracle.setPrices(bytes32[],uint256[],uint256[])
 ORACLE_ABI = [
     {
         "inputs": [
@@ -32,9 +89,32 @@ ORACLE_ABI = [
         "outputs": [],
         "stateMutability": "nonpayable",
         "type": "function",
-    }
+    },
+    {
+        "inputs": [
+            {"internalType": "bytes32[]", "name": "_symbols", "type": "bytes32[]"},
+            {"internalType": "uint256[]", "name": "_prices", "type": "uint256[]"},
+            {"internalType": "uint256[]", "name": "_tss", "type": "uint256[]"},
+        ],
+        "name": "setPrices",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
 ]
 
+
+def _abi_function(name: str) -> Tuple[bytes, List[str]]:
+    """(4-byte selector, input types) of an ORACLE_ABI function, so the ABI stays the single source of truth."""
+    entry = next(e for e in ORACLE_ABI if e.get("type") == "function" and e.get("name") == name)
+    types = [inp["type"] for inp in entry["inputs"]]
+    return Web3.keccak(text=f"{name}({','.join(types)})")[:4], types
+
+
+# function selectors, computed once; calldata is ABI-encoded directly on the hot path
+SET_PRICE_SELECTOR, SET_PRICE_TYPES = _abi_function("setPrice")
+SET_PRICES_SELECTOR, SET_PRICES_TYPES = _abi_function("setPrices")
+
 # -------- Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -43,9 +123,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger("oracle_updater")
 
+# one keep-alive session for all Yahoo quote requests
+_yahoo_session = requests.Session()
+_yahoo_session.headers.update({"User-Agent": "Mozilla/5.0"})  # default python-requests UA gets rejected
+# the quote endpoint needs a session cookie + matching crumb; obtained lazily, refreshed on 401
+_yahoo_crumb: Optional[str] = None
+# set when Yahoo hard-rejects the quote endpoint; the run then uses yfinance only
+_yahoo_quote_disabled = False
+
 
 # -------- Helpers
 
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that enables TCP keepalive on its pooled sockets."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+def check_signing_backend() -> None:
+    """Warn when eth_keys signs with its pure-Python ECDSA backend instead of libsecp256k1 (coincurve)."""
+    try:
+        from eth_keys.backends import get_backend
+        backend = type(get_backend()).__name__
+    except Exception as e:
+        logger.debug("Could not inspect eth_keys backend: %s", e)
+        return
+    if backend == "CoinCurveECCBackend":
+        logger.info("Signing with libsecp256k1 (coincurve)")
+    else:
+        logger.warning("Signing with %s (pure Python, ~ms per signature); pip install coincurve to speed it up", backend)
+
+
+def make_rpc_session() -> requests.Session:
+    """requests.Session for the RPC provider, pooled wide enough for concurrent calls."""
+    adapter = _KeepAliveAdapter(
+        pool_connections=RPC_POOL_CONNECTIONS,
+        pool_maxsize=RPC_POOL_MAXSIZE,
+        max_retries=Retry(total=3, backoff_factor=0.1),
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def symbol_to_bytes32(sym: str) -> bytes:
     """Encode a short ASCII symbol into 32-byte padded value for bytes32 param."""
     b = sym.encode("utf-8")
@@ -54,6 +179,45 @@ def symbol_to_bytes32(sym: str) -> bytes:
     return b.ljust(32, b"\0")
 
 
+def _refresh_yahoo_crumb() -> str:
+    """Cookie + crumb handshake required by the v7 quote endpoint."""
+    global _yahoo_crumb
+    # only sets the session cookie; the response itself is an error page
+    _yahoo_session.get(YAHOO_COOKIE_URL, timeout=YAHOO_TIMEOUT)
+    resp = _yahoo_session.get(YAHOO_CRUMB_URL, timeout=YAHOO_TIMEOUT)
+    resp.raise_for_status()
+    crumb = resp.text.strip()
+    if not crumb or "<" in crumb:
+        raise RuntimeError(f"unexpected crumb response: {crumb[:80]!r}")
+    _yahoo_crumb = crumb
+    return crumb
+
+
+def fetch_prices_yahoo(tickers: List[str]) -> Dict[str, float]:
+    """Fetch last prices for all tickers with a single call to Yahoo's quote endpoint.
+
+    Tickers missing from the response are left out of the returned dict.
+    """
+    def get_quotes(crumb: str):
+        return _yahoo_session.get(
+            YAHOO_QUOTE_URL, params={"symbols": ",".join(tickers), "crumb": crumb}, timeout=YAHOO_TIMEOUT
+        )
+
+    resp = get_quotes(_yahoo_crumb or _refresh_yahoo_crumb())
+    if resp.status_code == 401:
+        # crumb/cookie expired: one fresh handshake, then give up for this call
+        resp = get_quotes(_refresh_yahoo_crumb())
+    resp.raise_for_status()
+    by_upper = {t.upper(): t for t in tickers}
+    prices = {}
+    for quote in (resp.json().get("quoteResponse") or {}).get("result") or []:
+        t = by_upper.get(str(quote.get("symbol", "")).upper())
+        price = quote.get("regularMarketPrice")
+        if t is not None and price is not None:
+            prices[t] = float(price)
+    return prices
+
+
 def fetch_price_yahoo(ticker: str) -> float:
     """Fetch a latest price using yfinance."""
     try:
@@ -77,99 +241,477 @@ def fetch_price_yahoo(ticker: str) -> float:
     raise RuntimeError(f"failed to fetch price for {ticker}")
 
 
+def fetch_prices_concurrent(tickers: List[str]) -> List[Tuple[str, float]]:
+    """Fetch prices for all tickers in parallel; failed tickers are logged and left out."""
+    results = []
+    if not tickers:
+        return results
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(tickers))) as ex:
+        futures = {ex.submit(fetch_price_yahoo, t): t for t in tickers}
+        for fut in as_completed(futures):
+            t = futures[fut]
+            try:
+                results.append((t, fut.result()))
+            except Exception as e:
+                logger.error("Failed to fetch price for %s: %s", t, e)
+    # keep the caller's ticker order so tx logs stay predictable
+    order = {t: i for i, t in enumerate(tickers)}
+    results.sort(key=lambda r: order[r[0]])
+    return results
+
+
+def fetch_prices(tickers: List[str]) -> List[Tuple[str, float]]:
+    """Prices for tickers, served from the TTL cache when fresh.
+
+    Stale tickers go through one batched quote request; those it could not price
+    fall back to per-ticker yfinance fetches.
+    """
+    global _yahoo_quote_disabled
+    now = time.time()
+    prices = {}
+    for t in tickers:
+        cached = _price_cache.get(t)
+        if cached and now - cached[1] < PRICE_TTL:
+            prices[t] = cached[0]
+
+    stale = [t for t in tickers if t not in prices]
+    if stale:
+        fetched = {}
+        if not _yahoo_quote_disabled:
+            try:
+                fetched = fetch_prices_yahoo(stale)
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status in (401, 403):
+                    # rejected even with a fresh crumb: don't pay this round trip every round
+                    logger.warning("Yahoo quote endpoint rejected us (%s); using yfinance for this run", status)
+                    _yahoo_quote_disabled = True
+                else:
+                    logger.warning("Yahoo quote request failed, falling back to yfinance: %s", e)
+            except Exception as e:
+                logger.warning("Yahoo quote request failed, falling back to yfinance: %s", e)
+
+        missing = [t for t in stale if t not in fetched]
+        if missing:
+            fetched.update(fetch_prices_concurrent(missing))
+
+        fetched_at = time.time()
+        for t, price in fetched.items():
+            _price_cache[t] = (price, fetched_at)
+        prices.update(fetched)
+
+    return [(t, prices[t]) for t in tickers if t in prices]
+
+
+def scale_prices(prices: List[float]) -> List[int]:
+    """Scale float prices by PRICE_SCALE to the integers stored on-chain (round half to even, like round()).
+
+    Both paths raise on NaN/inf, so callers must filter non-finite prices first.
+    """
+    if np is not None and len(prices) >= VECTORIZE_MIN_TICKERS:
+        # round in numpy, but convert via Python int: no int64 cast, so large PRICE_SCALE values stay exact
+        return [int(x) for x in np.rint(np.asarray(prices, dtype=np.float64) * PRICE_SCALE).tolist()]
+    return [int(round(price * PRICE_SCALE)) for price in prices]
+
+
+def _observe_prices(updates: List[Tuple[str, int]], now: float) -> None:
+    """Update the per-ticker EMA of how often the scaled price actually changes."""
+    for t, price_scaled in updates:
+        last = _last_change.get(t)
+        if last is not None and last[0] == price_scaled:
+            continue
+        if last is not None:
+            dt = now - last[1]
+            prev = _change_cadence.get(t)
+            _change_cadence[t] = dt if prev is None else CADENCE_EMA_ALPHA * dt + (1 - CADENCE_EMA_ALPHA) * prev
+        _last_change[t] = (price_scaled, now)
+
+
+def next_watch_sleep(interval: int) -> float:
+    """Sleep before the next watch round: at least interval, stretched to half the fastest observed
+    change cadence (polling faster than quotes move only burns RPC calls), capped at MAX_WATCH_INTERVAL."""
+    if not _change_cadence:
+        return interval
+    cadence = min(_change_cadence.values())
+    return min(max(interval, cadence * 0.5), max(interval, MAX_WATCH_INTERVAL))
+
+
 # -------- BUILD AND SEND TX (CORRIGIDO)
 
-def build_and_send_setprice(w3: Web3, oracle_contract, acct, symbol: str, price_scaled: int, ts: int, dry_run: bool = False):
-    symbol_bytes = symbol_to_bytes32(symbol)
-    func = oracle_contract.functions.setPrice(symbol_bytes, price_scaled, ts)
+def _sync_nonce(w3: Web3, acct) -> int:
+    """Reload the cached nonce from the node (pending txs included)."""
+    global _nonce
+    _nonce = w3.eth.get_transaction_count(acct.address, "pending")
+    return _nonce
 
-    # build base tx
-    tx = func.build_transaction(
-        {
-            "from": acct.address,
-            "nonce": w3.eth.get_transaction_count(acct.address),
-            "chainId": CHAIN_ID,
-        }
-    )
 
-    # estimate gas
+def _estimate_gas_or_none(w3: Web3, call: dict) -> Optional[int]:
     try:
-        gas_est = w3.eth.estimate_gas(tx)
-        gas_limit = int(gas_est * GAS_MULTIPLIER)
+        return w3.eth.estimate_gas(call)
     except Exception as e:
-        logger.warning("gas estimate failed; using 200k gas (error: %s)", e)
-        gas_limit = 200_000
+        logger.warning("gas estimate failed; using %s gas (error: %s)", DEFAULT_GAS_LIMIT, e)
+        return None
 
-    # EIP-1559 fee model
+
+def _gas_price_or_default(w3: Web3) -> int:
     try:
-        base_fee = w3.eth.gas_price
+        return w3.eth.gas_price
     except Exception:
-        base_fee = 1_000_000_000  # fallback 1 gwei
+        return DEFAULT_GAS_PRICE
+
+
+def _fetch_gas_params(w3: Web3, calls: List[dict]) -> Tuple[int, List[Optional[int]]]:
+    """Return (gas_price, gas_estimates) for all calls using one JSON-RPC batch when supported.
+
+    An estimate is None when it failed.
+    """
+    if not calls:
+        return _gas_price_or_default(w3), []
+    try:
+        with w3.batch_requests() as batch:
+            batch.add(w3.eth.gas_price)
+            for call in calls:
+                batch.add(w3.eth.estimate_gas(call))
+            gas_price, *gas_ests = batch.execute()
+        return gas_price, gas_ests
+    except Exception as e:
+        # older web3 / providers without batch support, or a failed estimate inside the batch
+        logger.debug("JSON-RPC batch failed, falling back to concurrent single calls: %s", e)
+
+    # same requests, issued in parallel over the shared Web3 instance
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(calls) + 1)) as ex:
+        price_fut = ex.submit(_gas_price_or_default, w3)
+        gas_ests = list(ex.map(lambda call: _estimate_gas_or_none(w3, call), calls))
+        return price_fut.result(), gas_ests
+
+
+def setprice_calldata(symbol_bytes: bytes, price_scaled: int, ts: int) -> str:
+    return Web3.to_hex(SET_PRICE_SELECTOR + abi_encode(SET_PRICE_TYPES, [symbol_bytes, price_scaled, ts]))
+
+
+def setprices_calldata(symbols: List[bytes], prices_scaled: List[int], tss: List[int]) -> str:
+    return Web3.to_hex(SET_PRICES_SELECTOR + abi_encode(
+        SET_PRICES_TYPES, [symbols, prices_scaled, tss]
+    ))
 
+
+def _build_base_txs(acct, to: str, datas: List[str]) -> List[dict]:
+    """Unsigned EIP-1559 txs calling `to` with each calldata; nonce/gas/fees are placeholders filled in later."""
+    return [
+        {
+            "from": acct.address,
+            "to": to,
+            "value": 0,
+            "data": data,
+            "nonce": 0,
+            "chainId": CHAIN_ID,
+            "gas": DEFAULT_GAS_LIMIT,
+            "maxFeePerGas": 0,
+            "maxPriorityFeePerGas": 0,
+        }
+        for data in datas
+    ]
+
+
+def calibrate_gas(w3: Web3, oracle_addr: str, acct) -> None:
+    """Estimate setPrice/setPrices gas once and cache it in _gas_model.
+
+    setPrices is assumed linear in the number of entries, so it is probed with 1 and 2 entries.
+    Functions whose estimate fails keep being estimated per tx.
+    """
+    global _gas_calibrated, _setprices_supported
+    _gas_calibrated = True
+    _gas_model.clear()
+
+    ts = int(time.time())
+    probes = [symbol_to_bytes32(f"__gas_probe_{i}__") for i in range(2)]
+    txs = _build_base_txs(acct, oracle_addr, [
+        setprice_calldata(probes[0], 1, ts),
+        setprices_calldata(probes[:1], [1], [ts]),
+        setprices_calldata(probes, [1, 1], [ts, ts]),
+    ])
+    calls = [{"from": acct.address, "to": tx["to"], "data": tx["data"]} for tx in txs]
+    _, (one, batch_one, batch_two) = _fetch_gas_params(w3, calls)
+
+    if one is not None:
+        _gas_model["setPrice"] = (one, 0)
+    if batch_one is not None and batch_two is not None:
+        per_entry = batch_two - batch_one
+        _gas_model["setPrices"] = (batch_one - per_entry, per_entry)
+    elif one is not None and _setprices_supported:
+        # setPrice works but setPrices does not: oracle predates setPrices
+        logger.warning("Oracle does not accept setPrices; sending one setPrice tx per ticker")
+        _setprices_supported = False
+    logger.info("Gas model (base, per entry): %s", _gas_model)
+
+
+def _cached_gas_limit(fn_name: str, entries: int = 1) -> Optional[int]:
+    model = _gas_model.get(fn_name)
+    if model is None:
+        return None
+    base, per_entry = model
+    return int((base + per_entry * entries) * GAS_MULTIPLIER)
+
+
+def _prepare_txs(w3: Web3, acct, to: str, datas: List[str],
+                 gas_limits: Optional[List[Optional[int]]] = None,
+                 default_gas: Optional[int] = DEFAULT_GAS_LIMIT) -> List[Optional[dict]]:
+    """Build unsigned txs calling `to` with each calldata, with gas and fees filled in (nonce is set at send time).
+
+    Calls with a known gas limit in gas_limits skip eth_estimateGas. A failed estimate falls back to
+    default_gas; with default_gas=None that tx is returned as None instead.
+    """
+    txs = _build_base_txs(acct, to, datas)
+    if gas_limits is None:
+        gas_limits = [None] * len(txs)
+
+    # gas price + the missing gas estimates in a single round trip
+    to_estimate = [i for i, limit in enumerate(gas_limits) if limit is None]
+    calls = [{"from": acct.address, "to": txs[i]["to"], "data": txs[i]["data"]} for i in to_estimate]
+    base_fee, gas_ests = _fetch_gas_params(w3, calls)
+    limits = list(gas_limits)
+    for i, gas_est in zip(to_estimate, gas_ests):
+        limits[i] = int(gas_est * GAS_MULTIPLIER) if gas_est is not None else default_gas
+
+    # EIP-1559 fee model
     max_priority = int(base_fee * 0.1)
     max_fee = base_fee + max_priority
 
-    tx.update({
-        "gas": gas_limit,
-        "maxFeePerGas": max_fee,
-        "maxPriorityFeePerGas": max_priority,
-    })
+    for tx, gas_limit in zip(txs, limits):
+        tx.update({
+            "gas": gas_limit,
+            "maxFeePerGas": max_fee,
+            "maxPriorityFeePerGas": max_priority,
+        })
+    return [tx if tx["gas"] is not None else None for tx in txs]
+
+
+def _sign_raw_tx(tx: dict, key: bytes) -> bytes:
+    """Process-pool worker: sign one tx (module-level so it can be pickled)."""
+    return Account.from_key(key).sign_transaction(tx).raw_transaction
+
+
+def _presign_txs(w3: Web3, acct, txs: List[dict]) -> List[bytes]:
+    """Give txs consecutive nonces from the local counter and sign them on all cores."""
+    start = _nonce if _nonce is not None else _sync_nonce(w3, acct)
+    for i, tx in enumerate(txs):
+        tx["nonce"] = start + i
+    chunksize = max(1, len(txs) // ((os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor() as ex:
+        return list(ex.map(_sign_raw_tx, txs, [bytes(acct.key)] * len(txs), chunksize=chunksize))
+
+
+def _submit_prepared_tx(w3: Web3, acct, tx: dict, fn_name: str, label: str, dry_run: bool = False,
+                        raw_tx: Optional[bytes] = None):
+    """Sign and send a prepared tx with the next local nonce; returns the tx hash (None on dry-run).
+
+    raw_tx is a presigned copy of tx; it is only used while its nonce still matches the local counter.
+    """
+    global _nonce
+    nonce = _nonce if _nonce is not None else _sync_nonce(w3, acct)
+    if raw_tx is not None and tx.get("nonce") != nonce:
+        raw_tx = None  # an earlier send failed and the nonce was re-synced: sign again
+    tx["nonce"] = nonce
 
     # dry run
     if dry_run:
         logger.info(
-            "[dry-run] Prepared tx for %s price=%s ts=%s gas=%s maxFee=%s maxPrio=%s",
-            symbol, price_scaled, ts, gas_limit, max_fee, max_priority
+            "[dry-run] Prepared %s tx for %s gas=%s maxFee=%s maxPrio=%s",
+            fn_name, label, tx["gas"], tx["maxFeePerGas"], tx["maxPriorityFeePerGas"]
         )
         return None
 
     # sign and send
-    signed = acct.sign_transaction(tx)
-    tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-    logger.info("Sent setPrice tx for %s tx_hash=%s", symbol, tx_hash.hex())
+    if raw_tx is None:
+        raw_tx = acct.sign_transaction(tx).raw_transaction
+    try:
+        tx_hash = w3.eth.send_raw_transaction(raw_tx)
+    except Exception:
+        # nonce may be stale (tx sent elsewhere, dropped, ...): re-sync before the next send
+        _sync_nonce(w3, acct)
+        raise
+    _nonce = nonce + 1
+    logger.info("Sent %s tx for %s tx_hash=%s", fn_name, label, tx_hash.hex())
+    return tx_hash
 
-    # wait receipt
+
+def _await_receipt(w3: Web3, tx_hash, label: str):
+    """Wait for a sent tx to be mined; returns the receipt (None on timeout)."""
     try:
         receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
         logger.info(
             "Tx mined for %s status=%s gasUsed=%s",
-            symbol, receipt.status, receipt.gasUsed
+            label, receipt.status, receipt.gasUsed
         )
     except exceptions.TimeExhausted:
-        logger.warning("Receipt timeout for %s (%s)", symbol, tx_hash.hex())
+        logger.warning("Receipt timeout for %s (%s)", label, tx_hash.hex())
         return None
 
     return receipt
 
 
+def _mark_pushed(updates: List[Tuple[str, int]], ts: int, receipt) -> None:
+    if receipt is not None and receipt.status == 1:
+        for sym, price_scaled in updates:
+            _last_pushed[sym] = (price_scaled, ts)
+
+
+def _on_receipt(fn_name: str, updates: List[Tuple[str, int]], ts: int, receipt) -> None:
+    global _gas_calibrated
+    _mark_pushed(updates, ts, receipt)
+    if receipt is not None and receipt.status == 0 and fn_name in _gas_model:
+        # cached limit may be too low (or the call reverts anyway): re-estimate next round
+        logger.warning("%s tx reverted; gas will be re-estimated", fn_name)
+        _gas_calibrated = False
+
+
+def _submit_all_and_wait(w3: Web3, acct, jobs: list, ts: int, dry_run: bool = False) -> list:
+    """Send every (tx, fn_name, label, updates) job back to back, then wait for all receipts in parallel.
+
+    The txs share consecutive nonces, so they can be mined in the same block instead of one block each.
+    Returns one receipt (or None) per job.
+    """
+    raw_txs = [None] * len(jobs)
+    if not dry_run and len(jobs) >= PARALLEL_SIGN_MIN_TXS:
+        # signing is CPU bound (GIL): spread it over processes, then send the raw txs back to back
+        try:
+            raw_txs = _presign_txs(w3, acct, [tx for tx, _, _, _ in jobs])
+        except Exception as e:
+            logger.warning("Parallel signing failed, signing sequentially: %s", e)
+
+    tx_hashes = []
+    for (tx, fn_name, label, _), raw_tx in zip(jobs, raw_txs):
+        try:
+            tx_hashes.append(_submit_prepared_tx(w3, acct, tx, fn_name, label, dry_run=dry_run, raw_tx=raw_tx))
+        except Exception as e:
+            logger.exception("Failed to update %s: %s", label, e)
+            tx_hashes.append(None)
+
+    sent = [(i, tx_hash) for i, tx_hash in enumerate(tx_hashes) if tx_hash is not None]
+    receipts = [None] * len(jobs)
+    if sent:
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(sent))) as ex:
+            futures = {ex.submit(_await_receipt, w3, tx_hash, jobs[i][2]): i for i, tx_hash in sent}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    receipts[i] = fut.result()
+                except Exception as e:
+                    logger.exception("Failed to get receipt for %s: %s", jobs[i][2], e)
+
+    for (_, fn_name, _, updates), receipt in zip(jobs, receipts):
+        _on_receipt(fn_name, updates, ts, receipt)
+    return receipts
+
+
+def _setprice_jobs(w3: Web3, acct, to: str, updates: List[Tuple[str, int]], ts: int,
+                   sym_bytes: Dict[str, bytes]) -> list:
+    datas = [setprice_calldata(sym_bytes[sym], price_scaled, ts) for sym, price_scaled in updates]
+    txs = _prepare_txs(w3, acct, to, datas, [_cached_gas_limit("setPrice")] * len(datas))
+    return [(tx, "setPrice", sym, [(sym, price_scaled)]) for (sym, price_scaled), tx in zip(updates, txs)]
+
+
+def build_and_send_setprice_each(w3: Web3, oracle_addr: str, acct, updates: List[Tuple[str, int]], ts: int,
+                                 sym_bytes: Dict[str, bytes], dry_run: bool = False):
+    """Publish (symbol, price_scaled) pairs with one setPrice tx each; gas is estimated for all in one batch."""
+    jobs = _setprice_jobs(w3, acct, oracle_addr, updates, ts, sym_bytes)
+    return _submit_all_and_wait(w3, acct, jobs, ts, dry_run=dry_run)
+
+
+def build_and_send_setprices(w3: Web3, oracle_addr: str, acct, updates: List[Tuple[str, int]], ts: int,
+                             sym_bytes: Dict[str, bytes], dry_run: bool = False):
+    """Publish (symbol, price_scaled) pairs via oracle.setPrices, one tx per ORACLE_MAX_BATCH entries."""
+    chunks = [updates[i:i + ORACLE_MAX_BATCH] for i in range(0, len(updates), ORACLE_MAX_BATCH)]
+    datas = [
+        setprices_calldata(
+            [sym_bytes[sym] for sym, _ in chunk],
+            [price_scaled for _, price_scaled in chunk],
+            [ts] * len(chunk),
+        )
+        for chunk in chunks
+    ]
+    # no flat-gas fallback: the setPrice default limit is far too low for a multi-entry setPrices
+    txs = _prepare_txs(w3, acct, oracle_addr, datas,
+                       [_cached_gas_limit("setPrices", len(chunk)) for chunk in chunks], default_gas=None)
+    jobs = [(tx, "setPrices", ",".join(sym for sym, _ in chunk), chunk)
+            for chunk, tx in zip(chunks, txs) if tx is not None]
+
+    # chunks whose setPrices estimate failed go out as individual setPrice txs this round
+    fallback = [entry for chunk, tx in zip(chunks, txs) if tx is None for entry in chunk]
+    if fallback:
+        logger.warning("setPrices gas estimate failed; sending setPrice per ticker for %s",
+                       [sym for sym, _ in fallback])
+        jobs += _setprice_jobs(w3, acct, oracle_addr, fallback, ts, sym_bytes)
+    return _submit_all_and_wait(w3, acct, jobs, ts, dry_run=dry_run)
+
+
 # -------- Runners
 
-def run_once(w3: Web3, oracle_contract, acct, tickers: List[str], dry_run: bool = False):
+def run_once(w3: Web3, oracle_addr: str, acct, tickers: List[str], dry_run: bool = False, batch: bool = True,
+             sym_bytes: Optional[Dict[str, bytes]] = None):
+    if sym_bytes is None:
+        sym_bytes = {t: symbol_to_bytes32(t) for t in tickers}
     ts = int(time.time())
-    for t in tickers:
-        try:
-            price = fetch_price_yahoo(t)
-            price_scaled = int(round(price * PRICE_SCALE))
-            logger.info("Ticker=%s price=%s scaled=%s", t, price, price_scaled)
+    # one batched quote request for all tickers; sends stay sequential so nonces stay coherent
+    fetched = []
+    for t, price in fetch_prices(tickers):
+        # yfinance can report NaN/inf (e.g. fast_info off-hours); one bad quote must not abort the round
+        if not math.isfinite(price) or price < 0:
+            logger.error("Ticker=%s got invalid price %s, skipping", t, price)
+            continue
+        fetched.append((t, price))
+    scaled = scale_prices([price for _, price in fetched])
+    _observe_prices([(t, price_scaled) for (t, _), price_scaled in zip(fetched, scaled)], time.time())
+
+    updates = []
+    for (t, price), price_scaled in zip(fetched, scaled):
+        logger.info("Ticker=%s price=%s scaled=%s", t, price, price_scaled)
+        last = _last_pushed.get(t)
+        if last and last[0] == price_scaled and ts - last[1] < MAX_STALE:
+            logger.info("Ticker=%s unchanged, skipping", t)
+            continue
+        updates.append((t, price_scaled))
+
+    if not updates:
+        return
 
-            build_and_send_setprice(
-                w3, oracle_contract, acct,
-                t, price_scaled, ts,
-                dry_run=dry_run
-            )
+    try:
+        _sync_nonce(w3, acct)
+    except Exception as e:
+        logger.exception("Failed to load nonce for %s: %s", acct.address, e)
+        return
 
-            time.sleep(0.8)
+    if not _gas_calibrated:
+        try:
+            calibrate_gas(w3, oracle_addr, acct)
+        except Exception as e:
+            logger.warning("Gas calibration failed; estimating per tx: %s", e)
 
+    if batch and _setprices_supported:
+        try:
+            build_and_send_setprices(w3, oracle_addr, acct, updates, ts, sym_bytes, dry_run=dry_run)
         except Exception as e:
-            logger.exception("Failed to update ticker %s: %s", t, e)
+            logger.exception("Failed to update tickers %s: %s", [t for t, _ in updates], e)
+        return
+
+    try:
+        build_and_send_setprice_each(w3, oracle_addr, acct, updates, ts, sym_bytes, dry_run=dry_run)
+    except Exception as e:
+        logger.exception("Failed to update tickers %s: %s", [t for t, _ in updates], e)
 
 
-def run_watch(w3: Web3, oracle_contract, acct, tickers: List[str], interval: int, dry_run: bool = False):
+def run_watch(w3: Web3, oracle_addr: str, acct, tickers: List[str], interval: int, dry_run: bool = False, batch: bool = True,
+              sym_bytes: Optional[Dict[str, bytes]] = None):
     logger.info("Entering watch mode for tickers=%s interval=%ss (ctrl-c to stop)", tickers, interval)
+    if PRICE_TTL <= interval:
+        logger.info("PRICE_TTL=%ss <= interval: every round fetches fresh prices", PRICE_TTL)
     try:
         while True:
-            run_once(w3, oracle_contract, acct, tickers, dry_run=dry_run)
-            time.sleep(interval)
+            run_once(w3, oracle_addr, acct, tickers, dry_run=dry_run, batch=batch, sym_bytes=sym_bytes)
+            sleep_s = next_watch_sleep(interval)
+            if sleep_s > interval:
+                logger.info("Prices change every ~%.0fs; sleeping %.0fs", min(_change_cadence.values()), sleep_s)
+            time.sleep(sleep_s)
     except KeyboardInterrupt:
         logger.info("Watch stopped by user")
 
@@ -183,12 +725,15 @@ def parse_args():
                    help="Comma separated tickers (overrides TICKERS env var), e.g. AAPL or AAPL,TSLA,GOOG")
     p.add_argument("--once", action="store_true", help="Run once and exit")
     p.add_argument("--watch", action="store_true", help="Run periodically")
-    p.add_argument("--interval", type=int, default=60, help="Interval seconds for watch mode")
+    p.add_argument("--interval", type=int, default=60,
+                   help="Minimum interval seconds for watch mode (stretched when prices change less often)")
     p.add_argument("--rpc", type=str, default=RPC_URL, help="RPC URL (overrides .env)")
     p.add_argument("--oracle", type=str, default=ORACLE_ADDRESS, help="Oracle contract address (overrides .env)")
     p.add_argument("--pk", type=str, default=UPDATER_PRIVATE_KEY, help="Updater private key (overrides .env)")
     p.add_argument("--scale", type=int, default=PRICE_SCALE, help="PRICE_SCALE multiplier")
     p.add_argument("--dry-run", action="store_true", help="Do not send txs, only print what would be sent")
+    p.add_argument("--no-batch", action="store_true",
+                   help="Send one setPrice tx per ticker instead of a single setPrices tx")
     return p.parse_args()
 
 
@@ -228,24 +773,34 @@ def main():
     global PRICE_SCALE
     PRICE_SCALE = args.scale
 
-    w3 = Web3(Web3.HTTPProvider(rpc))
+    # reuse TCP/TLS connections to the RPC across all calls and threads
+    w3 = Web3(Web3.HTTPProvider(rpc, session=make_rpc_session()))
     if not w3.is_connected():
         logger.error("Failed to connect to RPC at %s", rpc)
         sys.exit(1)
 
     acct = Account.from_key(pk)
     logger.info("Using updater address %s", acct.address)
+    check_signing_backend()
     logger.info("Tickers to update: %s", tickers)
 
-    oracle_contract = w3.eth.contract(address=oracle_addr, abi=ORACLE_ABI)
+    # bytes32 keys are fixed for the whole run; encode them once (also rejects bad symbols up front)
+    try:
+        sym_bytes = {t: symbol_to_bytes32(t) for t in tickers}
+    except ValueError as e:
+        logger.error("Invalid ticker: %s", e)
+        sys.exit(1)
 
     if args.dry_run:
         logger.info("Dry-run enabled: will not send transactions")
 
+    batch = BATCH_UPDATES and not args.no_batch
+
     if args.once:
-        run_once(w3, oracle_contract, acct, tickers, dry_run=args.dry_run)
+        run_once(w3, oracle_addr, acct, tickers, dry_run=args.dry_run, batch=batch, sym_bytes=sym_bytes)
     elif args.watch:
-        run_watch(w3, oracle_contract, acct, tickers, interval=args.interval, dry_run=args.dry_run)
+        run_watch(w3, oracle_addr, acct, tickers, interval=args.interval, dry_run=args.dry_run, batch=batch,
+                  sym_bytes=sym_bytes)
     else:
         logger.info("Please pass --once or --watch. Exiting.")
 